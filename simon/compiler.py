@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import itertools
+import textwrap
+import typing as t
+
+import attr
+
+from simon.node import _EMPTY_CHILDREN, _node_id, LeafNode, Node
+
+
+_UNMEMOIZED = """\
+def {name}(state):
+    position = state.position
+{body}
+    if result is not None:
+        result = {action}(result)
+    return result
+"""
+
+_MEMOIZED = """\
+def {name}(state):
+    position = state.position
+    if (memo := state.cache.get({expression})) is None:
+        memo = state.cache[{expression}] = {{}}
+    if (entry := memo.get(position, _MISS)) is not _MISS:
+        if entry is None:
+            return None
+        state.position = entry[1]
+        return entry[0]
+{body}
+    if result is not None:
+        result = {action}(result)
+        memo[position] = result, state.position
+    else:
+        memo[position] = None
+    return result
+"""
+
+
+class _Compilable(t.Protocol):
+    action: t.Callable[..., t.Any]
+    _memoize: bool
+
+    def parse(self, state: t.Any) -> t.Any:
+        ...
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        ...
+
+    def _inline(self, compiler: Compiler, position: str) -> t.Optional[str]:
+        ...
+
+
+@attr.s(slots=True)
+class Compiler:
+    """Generates a specialized parsing function per expression."""
+
+    unmemoized: t.AbstractSet[_Compilable] = attr.ib(default=frozenset())
+    _namespace: dict[str, t.Any] = attr.ib(
+        init=False,
+        factory=lambda: {
+            "LeafNode": LeafNode,
+            "Node": Node,
+            "_EMPTY_CHILDREN": _EMPTY_CHILDREN,
+            "_MISS": object(),
+        },
+    )
+    _functions: dict[_Compilable, str] = attr.ib(init=False, factory=dict)
+    _pending: list[tuple[str, _Compilable]] = attr.ib(init=False, factory=list)
+    _bindings: list[str] = attr.ib(init=False, factory=list)
+    _counter: t.Iterator[int] = attr.ib(init=False, factory=itertools.count)
+
+    def constant(self, value: object) -> str:
+        """Binds `value` in the generated module and returns its name."""
+        name = f"_constant_{next(self._counter)}"
+        self._namespace[name] = value
+        return name
+
+    def function(self, expression: _Compilable) -> str:
+        """Returns the name of the function that parses `expression`."""
+        if (name := self._functions.get(expression)) is None:
+            name = self._functions[expression] = f"_parse_{next(self._counter)}"
+            self._pending.append((name, expression))
+        return name
+
+    def call(self, expression: _Compilable, position: str) -> str:
+        """Returns statements that parse `expression` into `result`.
+
+        Unmemoized expressions that support it are inlined, starting at the
+        local named by `position`; the rest call their generated function.
+        """
+        memoized = self._memoized(expression)
+        if memoized or (body := expression._inline(self, position)) is None:
+            return f"result = {self.function(expression)}(state)"
+        if expression.action is not _node_id:
+            action = self.constant(expression.action)
+            body += f"\nif result is not None:\n    result = {action}(result)"
+        return body
+
+    def functions(self, expressions: t.Iterable[_Compilable]) -> str:
+        """Binds a tuple of the functions parsing each expression."""
+        return self._bind(self._tuple(expressions))
+
+    def table(self, expressions: t.Mapping[str, t.Iterable[_Compilable]]) -> str:
+        """Binds a mapping of keys to the functions parsing each expression."""
+        entries = ", ".join(
+            f"{key!r}: {self._tuple(value)}" for key, value in expressions.items()
+        )
+        return self._bind(f"{{{entries}}}")
+
+    def _memoized(self, expression: _Compilable) -> bool:
+        return expression._memoize and expression not in self.unmemoized
+
+    def _tuple(self, expressions: t.Iterable[_Compilable]) -> str:
+        return f"({''.join(f'{self.function(value)}, ' for value in expressions)})"
+
+    def _bind(self, source: str) -> str:
+        name = f"_table_{next(self._counter)}"
+        self._bindings.append(f"{name} = {source}")
+        return name
+
+    def compile(self, expression: _Compilable) -> t.Callable[..., t.Any]:
+        """Generates functions for every reachable expression."""
+        root = self.function(expression)
+        sources = []
+        while self._pending:
+            name, expression = self._pending.pop()
+            if (body := expression._emit(self)) is None:
+                self._namespace[name] = expression.parse
+                continue
+            template = _MEMOIZED if self._memoized(expression) else _UNMEMOIZED
+            sources.append(
+                template.format(
+                    name=name,
+                    expression=self.constant(expression),
+                    action=self.constant(expression.action),
+                    body=textwrap.indent(body, "    "),
+                )
+            )
+        sources.extend(self._bindings)
+        exec(compile("\n".join(sources), "<simon>", "exec"), self._namespace)
+        return self._namespace[root]
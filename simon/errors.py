@@ -15,6 +15,9 @@ class TextError(SimonError):
 
     text: str = attr.ib()
     position: int = attr.ib()
+    line_offsets: t.Optional[list[int]] = attr.ib(
+        kw_only=True, default=None, repr=False, eq=False
+    )
 
     def __attrs_post_init__(self, *arguments: t.Any) -> None:
         super().__init__(*arguments)
@@ -28,7 +31,7 @@ class TextError(SimonError):
 
     @property
     def row_col(self) -> tuple[int, int]:
-        return _compute_row_col(self.text, self.position)
+        return _compute_row_col(self.text, self.position, self.line_offsets)
 
 
 class UnknownTokenError(TextError):
@@ -36,3 +39,29 @@ class UnknownTokenError(TextError):
 
     def __str__(self) -> str:
         return f"Invalid character {self.character} at position {self.position}"
+
+
+@attr.s(frozen=True, slots=True)
+class LeftRecursionError(SimonError):
+    """Raised on rules that can reach themselves without consuming text."""
+
+    rules: tuple[str, ...] = attr.ib()
+
+    def __attrs_post_init__(self, *arguments: t.Any) -> None:
+        super().__init__(*arguments)
+
+    def __str__(self) -> str:
+        return f"Left recursion through {' -> '.join(self.rules)}"
+
+
+@attr.s(frozen=True, slots=True)
+class EmptyTokenError(SimonError):
+    """Raised on token patterns that match without consuming text."""
+
+    terminal: str = attr.ib()
+
+    def __attrs_post_init__(self, *arguments: t.Any) -> None:
+        super().__init__(*arguments)
+
+    def __str__(self) -> str:
+        return f"Pattern for {self.terminal} matches empty text"
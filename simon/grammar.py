@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+import collections
 import re
+import sys
+import textwrap
 import typing as t
+import warnings
 
 import attr
 
-from simon.node import Node
+try:
+    from re import _parser as _sre_parse  # type: ignore
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+from simon.compiler import Compiler
+from simon.errors import LeftRecursionError
+from simon.node import _EMPTY_CHILDREN, _node_id, LeafNode, Node
 
 
 @attr.s(slots=True, cmp=False)
@@ -13,6 +24,7 @@ class ParserState:
     text: str = attr.ib()
     position: int = attr.ib()
     cache: dict = attr.ib(factory=dict)
+    unmemoized: frozenset[Expression] = attr.ib(kw_only=True, factory=frozenset)
 
     def mark(self) -> int:
         return self.position
@@ -20,65 +32,130 @@ class ParserState:
     def move(self, position: int) -> None:
         self.position = position
 
+    def trim(self, position: int) -> None:
+        for memo in self.cache.values():
+            for start in [start for start in memo if start < position]:
+                del memo[start]
+
 
 _R = t.TypeVar("_R")
 
+_MISS = object()
+
 
 class _Expression(t.Protocol[_R]):
     action: t.Callable[..., _R]
+    _memoize: bool
 
     def parse(self, state: ParserState) -> t.Optional[_R]:
-        cache_key = id(self), state.position
-        try:
-            return state.cache[cache_key]
-        except KeyError:
+        if not self._memoize or self in state.unmemoized:
+            if (result := self._parse(state)) is not None:
+                return self.action(result)
+            return None
+        position = state.position
+        if (memo := state.cache.get(self)) is None:
+            memo = state.cache[self] = {}
+        if (entry := memo.get(position, _MISS)) is _MISS:
             if (result := self._parse(state)) is not None:
-                _result = self.action(result)
-                state.cache[cache_key] = _result
-                return _result
+                result = self.action(result)
+                memo[position] = result, state.position
             else:
-                state.cache[cache_key] = None
-                return None
+                memo[position] = None
+            return result
+        if entry is None:
+            return None
+        result, end = entry
+        state.position = end
+        return result
 
     def _parse(self, state: ParserState) -> t.Any:
         raise NotImplementedError
 
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        return None
+
+    def _inline(self, compiler: Compiler, position: str) -> t.Optional[str]:
+        return None
+
 
 @attr.s(slots=True, cmp=False)
 class Expression(_Expression[_R]):
     action: t.Callable[..., _R] = attr.ib(kw_only=True)
+    _memoize: bool = attr.ib(init=False, repr=False, default=True)
 
 
 class _Pattern(Expression[_R]):
     _pattern: t.Pattern[str]
+    _match: t.Callable[[str, int], t.Optional[t.Match[str]]]
 
     def _parse(self, state: ParserState) -> t.Any:
-        position = state.mark()
-        if (result := self._pattern.match(state.text, state.position)) is not None:
-            state.move(result.end(0))
-            return Node([result.group(0)], position, state.position)
+        position = state.position
+        if (result := self._match(state.text, position)) is not None:
+            state.position = result.end(0)
+            return LeafNode(result.group(0), position, state.position)
         return None
 
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        return self._inline(compiler, "position")
+
+    def _inline(self, compiler: Compiler, position: str) -> t.Optional[str]:
+        match = compiler.constant(self._match)
+        return (
+            f"if (match := {match}(state.text, {position})) is not None:\n"
+            "    state.position = end = match.end()\n"
+            f"    result = LeafNode(match.group(), {position}, end)\n"
+            "else:\n"
+            "    result = None"
+        )
+
 
 @attr.s(slots=True, cmp=False)
-class Literal(_Pattern[_R]):
+class Literal(Expression[_R]):
     literal: str = attr.ib()
-    _pattern: t.Pattern[str] = attr.ib(
+    _length: int = attr.ib(
         init=False,
         repr=False,
-        default=attr.Factory(
-            lambda self: re.compile(re.escape(self.literal)), takes_self=True
-        ),
+        default=attr.Factory(lambda self: len(self.literal), takes_self=True),
     )
 
+    def _parse(self, state: ParserState) -> t.Any:
+        position = state.position
+        if state.text.startswith(self.literal, position):
+            state.position = position + self._length
+            return LeafNode(self.literal, position, state.position)
+        return None
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        return self._inline(compiler, "position")
+
+    def _inline(self, compiler: Compiler, position: str) -> t.Optional[str]:
+        literal = compiler.constant(self.literal)
+        return (
+            f"if state.text.startswith({literal}, {position}):\n"
+            f"    state.position = end = {position} + {self._length}\n"
+            f"    result = LeafNode({literal}, {position}, end)\n"
+            "else:\n"
+            "    result = None"
+        )
+
 
 @attr.s(slots=True, cmp=False)
 class RegEx(_Pattern[_R]):
     pattern: str = attr.ib()
+    compile_pattern: t.Callable[[str], t.Pattern[str]] = attr.ib(
+        kw_only=True, repr=False, default=re.compile
+    )
     _pattern: t.Pattern[str] = attr.ib(
         init=False,
         repr=False,
-        default=attr.Factory(lambda self: re.compile(self.pattern), takes_self=True),
+        default=attr.Factory(
+            lambda self: self.compile_pattern(self.pattern), takes_self=True
+        ),
+    )
+    _match: t.Callable[[str, int], t.Optional[t.Match[str]]] = attr.ib(
+        init=False,
+        repr=False,
+        default=attr.Factory(lambda self: self._pattern.match, takes_self=True),
     )
 
 
@@ -87,112 +164,570 @@ class Optional(Expression[_R]):
     optional: Expression = attr.ib()
 
     def _parse(self, state: ParserState) -> t.Any:
-        position = state.mark()
+        position = state.position
         if (result := self.optional.parse(state)) is not None:
             return result
-        state.move(position)
-        return Node([], position, position)
+        state.position = position
+        return Node(_EMPTY_CHILDREN, position, position)
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        return (
+            f"{compiler.call(self.optional, 'position')}\n"
+            "if result is None:\n"
+            "    state.position = position\n"
+            "    result = Node(_EMPTY_CHILDREN, position, position)"
+        )
+
+
+@attr.s(slots=True, cmp=False)
+class Cut(Expression[_R]):
+    """Matches nothing, forgetting memoized results from before it."""
+
+    _memoize: bool = attr.ib(init=False, repr=False, default=False)
+
+    def _parse(self, state: ParserState) -> t.Any:
+        position = state.position
+        state.trim(position)
+        return Node(_EMPTY_CHILDREN, position, position)
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        return (
+            "state.trim(position)\n"
+            "result = Node(_EMPTY_CHILDREN, position, position)"
+        )
+
+
+def _min_width(pattern: t.Pattern[str]) -> int:
+    # Lookarounds and anchors match nothing yet fail on empty text, so the
+    # width comes from the parsed pattern rather than from a trial match.
+    try:
+        return _sre_parse.parse(pattern.pattern, pattern.flags).getwidth()[0]
+    except (re.error, TypeError):
+        return 0
+
+
+def _nullable(
+    expression: Expression,
+    cache: dict[Expression, bool],
+    strict: bool = False,
+    rules: bool = True,
+) -> bool:
+    if (nullable := cache.get(expression)) is not None:
+        return nullable
+    # An expression reached again before it is resolved is assumed nullable,
+    # which keeps the zero-width check and errs towards finding recursion.
+    cache[expression] = True
+    if isinstance(expression, Literal):
+        nullable = not expression.literal
+    elif isinstance(expression, _Pattern) and strict:
+        nullable = _min_width(expression._pattern) == 0
+    elif isinstance(expression, Many):
+        nullable = _nullable(expression.expression, cache, strict, rules)
+    elif isinstance(expression, Sequence):
+        nullable = all(
+            _nullable(child, cache, strict, rules) for child in expression.expressions
+        )
+    elif isinstance(expression, Alternatives):
+        nullable = any(
+            _nullable(child, cache, strict, rules) for child in expression.alternatives
+        )
+    elif isinstance(expression, Rule) and expression.expr is not None and rules:
+        nullable = _nullable(expression.expr, cache, strict, rules)
+    else:
+        nullable = True
+    cache[expression] = nullable
+    return nullable
+
+
+def _repeat(
+    expression: Expression, state: ParserState, results: list, consuming: bool
+) -> int:
+    parse = expression.parse
+    append = results.append
+    capture = results is not _EMPTY_CHILDREN
+    current = state.position
+    if consuming:
+        while (result := parse(state)) is not None:
+            if capture:
+                append(result)
+            current = state.position
+        return current
+    while (result := parse(state)) is not None:
+        if state.position == current:
+            break
+        if capture:
+            append(result)
+        current = state.position
+    return current
+
+
+def _emit_repetition(
+    compiler: Compiler, expression: Expression, consuming: bool, capture: bool
+) -> str:
+    call = textwrap.indent(compiler.call(expression, "current"), "    ")
+    lines = [
+        "while True:",
+        "    current = state.position",
+        call,
+        "    if result is None:",
+        "        break",
+    ]
+    if not consuming:
+        lines += ["    if state.position == current:", "        break"]
+    if capture:
+        lines.insert(0, "append = results.append")
+        lines.append("    append(result)")
+    return "\n".join(lines)
 
 
 @attr.s(slots=True, cmp=False)
 class Some(Expression[_R]):
     expression: Expression = attr.ib()
+    capture: bool = attr.ib(kw_only=True, default=True)
+    _consuming: bool = attr.ib(
+        init=False,
+        repr=False,
+        default=attr.Factory(
+            lambda self: not _nullable(self.expression, {}, rules=False),
+            takes_self=True,
+        ),
+    )
 
     def _parse(self, state: ParserState) -> t.Any:
-        results = []
-        start = current = state.mark()
-        while (result := self.expression.parse(state)) is not None:
-            if state.position - current == 0:
-                break
-            results.append(result)
-            current = state.mark()
-        return Node(results, start, current)
+        results = [] if self.capture else _EMPTY_CHILDREN
+        start = state.position
+        end = _repeat(self.expression, state, results, self._consuming)
+        return Node(results, start, end)
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        repetition = _emit_repetition(
+            compiler, self.expression, self._consuming, self.capture
+        )
+        results = "[]" if self.capture else "_EMPTY_CHILDREN"
+        return (
+            f"results = {results}\n"
+            f"{repetition}\n"
+            "result = Node(results, position, current)"
+        )
 
 
 @attr.s(slots=True, cmp=False)
 class Many(Expression[_R]):
     expression: Expression = attr.ib()
+    capture: bool = attr.ib(kw_only=True, default=True)
+    _consuming: bool = attr.ib(
+        init=False,
+        repr=False,
+        default=attr.Factory(
+            lambda self: not _nullable(self.expression, {}, rules=False),
+            takes_self=True,
+        ),
+    )
 
     def _parse(self, state: ParserState) -> t.Any:
-        start = state.mark()
+        start = state.position
         if (child := self.expression.parse(state)) is None:
-            state.move(start)
+            state.position = start
             return None
 
-        results = [child]
-        current = state.mark()
-        while (result := self.expression.parse(state)) is not None:
-            if state.position - current == 0:
-                break
-            results.append(result)
-            current = state.mark()
-        return Node(results, start, current)
+        results = [child] if self.capture else _EMPTY_CHILDREN
+        end = _repeat(self.expression, state, results, self._consuming)
+        return Node(results, start, end)
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        repetition = _emit_repetition(
+            compiler, self.expression, self._consuming, self.capture
+        )
+        results = "[result]" if self.capture else "_EMPTY_CHILDREN"
+        return (
+            f"{compiler.call(self.expression, 'position')}\n"
+            "if result is None:\n"
+            "    state.position = position\n"
+            "else:\n"
+            f"    results = {results}\n"
+            f"{textwrap.indent(repetition, '    ')}\n"
+            "    result = Node(results, position, current)"
+        )
 
 
 @attr.s(slots=True, cmp=False)
 class PositiveLookahead(Expression[_R]):
     expression: Expression = attr.ib()
+    _memoize: bool = attr.ib(init=False, repr=False, default=False)
 
     def _parse(self, state: ParserState) -> t.Any:
-        position = state.mark()
+        position = state.position
         if self.expression.parse(state) is not None:
-            state.move(position)
+            state.position = position
             return None
-        return Node([], position, position)
+        return Node(_EMPTY_CHILDREN, position, position)
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        return (
+            f"{compiler.call(self.expression, 'position')}\n"
+            "if result is not None:\n"
+            "    state.position = position\n"
+            "    result = None\n"
+            "else:\n"
+            "    result = Node(_EMPTY_CHILDREN, position, position)"
+        )
 
 
 @attr.s(slots=True, cmp=False)
 class NegativeLookahead(Expression[_R]):
     expression: Expression = attr.ib()
+    _memoize: bool = attr.ib(init=False, repr=False, default=False)
 
     def _parse(self, state: ParserState) -> t.Any:
-        position = state.mark()
+        position = state.position
         if self.expression.parse(state) is not None:
-            state.move(position)
-            return Node([], position, position)
+            state.position = position
+            return Node(_EMPTY_CHILDREN, position, position)
         return None
 
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        return (
+            f"{compiler.call(self.expression, 'position')}\n"
+            "if result is not None:\n"
+            "    state.position = position\n"
+            "    result = Node(_EMPTY_CHILDREN, position, position)"
+        )
+
 
 @attr.s(slots=True, cmp=False)
 class Sequence(Expression[_R]):
     expressions: list[Expression] = attr.ib()
+    capture: bool = attr.ib(kw_only=True, default=True)
 
     def _parse(self, state: ParserState) -> t.Any:
-        results = []
-        position = state.mark()
+        capture = self.capture
+        results = [] if capture else _EMPTY_CHILDREN
+        position = state.position
         for expression in self.expressions:
-            if (result := expression.parse(state)) is not None:
-                results.append(result)
-            else:
-                state.move(position)
+            if (result := expression.parse(state)) is None:
+                state.position = position
                 return None
+            if capture:
+                results.append(result)
+        return Node(results, position, state.position)
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        if not self.expressions:
+            return "result = Node([], position, position)"
+        tests = [
+            f"(child_{index} := result) is not None"
+            if self.capture
+            else "result is not None"
+            for index in range(len(self.expressions))
+        ]
+        lines = [compiler.call(self.expressions[0], "position")]
+        for test, expression in zip(tests, self.expressions[1:]):
+            call = textwrap.indent(compiler.call(expression, "current"), "    ")
+            lines.append(f"if {test}:\n    current = state.position\n{call}")
+        children = "_EMPTY_CHILDREN"
+        if self.capture:
+            children = ", ".join(f"child_{index}" for index in range(len(tests)))
+            children = f"[{children}]"
+        lines.append(
+            f"if {tests[-1]}:\n"
+            f"    result = Node({children}, position, state.position)\n"
+            "else:\n"
+            "    state.position = position"
+        )
+        return "\n".join(lines)
+
+
+def _flatten_alternatives(alternatives: list[Expression]) -> list[Expression]:
+    flattened = []
+    for alternative in alternatives:
+        if isinstance(alternative, Alternatives) and alternative.action is _node_id:
+            flattened.extend(alternative.alternatives)
         else:
-            return Node(results, position, state.position)
+            flattened.append(alternative)
+    return flattened
+
+
+def _first_characters(
+    expression: Expression,
+    cache: dict[Expression, t.Optional[frozenset[str]]],
+    rules: bool = True,
+) -> t.Optional[frozenset[str]]:
+    if expression in cache:
+        return cache[expression]
+    # Reaching an expression again before it is resolved means left
+    # recursion, which Grammar rejects, so leaving it unknown is safe.
+    cache[expression] = None
+    first: t.Optional[frozenset[str]] = None
+    if isinstance(expression, Literal):
+        first = frozenset(expression.literal[:1]) or None
+    elif isinstance(expression, (Many, Sequence)):
+        if children := _children(expression):
+            first = _first_characters(children[0], cache, rules)
+    elif isinstance(expression, Alternatives):
+        first = frozenset()
+        for alternative in expression.alternatives:
+            if (characters := _first_characters(alternative, cache, rules)) is None:
+                first = None
+                break
+            first |= characters
+    elif isinstance(expression, Rule) and expression.expr is not None and rules:
+        first = _first_characters(expression.expr, cache, rules)
+    cache[expression] = first
+    return first
+
+
+def _dispatch_table(
+    alternatives: list[Expression],
+    cache: dict[Expression, t.Optional[frozenset[str]]],
+    rules: bool = True,
+) -> tuple[t.Optional[dict[str, list[Expression]]], list[Expression]]:
+    firsts = [
+        _first_characters(alternative, cache, rules) for alternative in alternatives
+    ]
+    fallback = [
+        alternative for alternative, first in zip(alternatives, firsts) if first is None
+    ]
+    characters = set().union(*filter(None, firsts))
+    if not characters or len(alternatives) < 2:
+        return None, fallback
+    table = {
+        character: [
+            alternative
+            for alternative, first in zip(alternatives, firsts)
+            if first is None or character in first
+        ]
+        for character in sorted(characters)
+    }
+    return table, fallback
 
 
 @attr.s(slots=True, cmp=False)
 class Alternatives(Expression[_R]):
-    alternatives: list[Expression] = attr.ib()
+    alternatives: list[Expression] = attr.ib(converter=_flatten_alternatives)
+    _table: t.Optional[dict[str, list[Expression]]] = attr.ib(
+        init=False, repr=False, default=None
+    )
+    _fallback: list[Expression] = attr.ib(init=False, repr=False, factory=list)
+
+    def __attrs_post_init__(self) -> None:
+        # Rules may not be bound yet; Grammar rebuilds the table through them.
+        self._table, self._fallback = _dispatch_table(
+            self.alternatives, {}, rules=False
+        )
 
     def _parse(self, state: ParserState) -> t.Any:
-        position = state.mark()
-        for alternative in self.alternatives:
+        position = state.position
+        alternatives = self.alternatives
+        if self._table is not None:
+            following = position + 1
+            alternatives = self._table.get(
+                state.text[position:following], self._fallback
+            )
+        for alternative in alternatives:
             if (result := alternative.parse(state)) is not None:
                 return result
             else:
-                state.move(position)
+                state.position = position
         else:
             return None
 
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        if self._table is not None:
+            table = compiler.table(self._table)
+            if not self._fallback and all(
+                len(alternatives) == 1 for alternatives in self._table.values()
+            ):
+                return (
+                    f"if (functions := {table}"
+                    ".get(state.text[position : position + 1])) is None:\n"
+                    "    result = None\n"
+                    "elif (result := functions[0](state)) is None:\n"
+                    "    state.position = position"
+                )
+            fallback = compiler.functions(self._fallback)
+            return (
+                "result = None\n"
+                f"for function in {table}.get(\n"
+                f"    state.text[position : position + 1], {fallback}\n"
+                "):\n"
+                "    if (result := function(state)) is not None:\n"
+                "        break\n"
+                "    state.position = position"
+            )
+        lines = ["result = None"]
+        for alternative in self.alternatives:
+            call = textwrap.indent(compiler.call(alternative, "position"), "    ")
+            lines.append(
+                "if result is None:\n"
+                f"{call}\n"
+                "    if result is None:\n"
+                "        state.position = position"
+            )
+        return "\n".join(lines)
+
 
 @attr.s(slots=True, cmp=False)
 class Rule(Expression[_R]):
-    name: str = attr.ib()
+    name: str = attr.ib(converter=sys.intern)
     expr: Expression = attr.ib()
 
     def _parse(self, state: ParserState) -> t.Any:
-        if (result := self.expr.parse(state)) is not None:
-            if isinstance(result, Node):
-                result.tag = self.name
-            return result
-        return None
+        if (result := self.expr._parse(state)) is None:
+            return None
+        if isinstance(result := self.expr.action(result), (Node, LeafNode)):
+            result.tag = self.name
+        return result
+
+    def _emit(self, compiler: Compiler) -> t.Optional[str]:
+        if (body := self.expr._emit(compiler)) is None:
+            body = f"result = {compiler.constant(self.expr._parse)}(state)"
+        action = compiler.constant(self.expr.action)
+        return (
+            f"{body}\n"
+            "if result is not None and "
+            f"isinstance(result := {action}(result), (Node, LeafNode)):\n"
+            f"    result.tag = {compiler.constant(self.name)}"
+        )
+
+
+def _children(expression: Expression) -> list[Expression]:
+    if isinstance(expression, Optional):
+        return [expression.optional]
+    if isinstance(expression, (Some, Many, PositiveLookahead, NegativeLookahead)):
+        return [expression.expression]
+    if isinstance(expression, Sequence):
+        return expression.expressions
+    if isinstance(expression, Alternatives):
+        return expression.alternatives
+    if isinstance(expression, Rule):
+        return [expression.expr]
+    return []
+
+
+def _left_rules(expression: Expression, nullable: dict[Expression, bool]) -> list[Rule]:
+    if isinstance(expression, Rule):
+        return [expression]
+    rules = []
+    for child in _children(expression):
+        rules.extend(_left_rules(child, nullable))
+        if isinstance(expression, Sequence) and not _nullable(
+            child, nullable, strict=True
+        ):
+            break
+    return rules
+
+
+def _reject_left_recursion(expressions: set[Expression]) -> None:
+    nullable: dict[Expression, bool] = {}
+    calls = {
+        expression: _left_rules(expression.expr, nullable)
+        for expression in expressions
+        if isinstance(expression, Rule) and expression.expr is not None
+    }
+    path: list[Rule] = []
+    visited: set[Rule] = set()
+
+    def visit(rule: Rule) -> None:
+        if rule in path:
+            start = path.index(rule)
+            cycle = path[start:] + [rule]
+            raise LeftRecursionError(tuple(rule.name for rule in cycle))
+        if rule in visited:
+            return
+        path.append(rule)
+        for callee in calls.get(rule, []):
+            visit(callee)
+        path.pop()
+        visited.add(rule)
+
+    for rule in sorted(calls, key=lambda rule: rule.name):
+        visit(rule)
+
+
+def _describe(expression: Expression) -> str:
+    if isinstance(expression, Rule):
+        return expression.name
+    if isinstance(expression, Literal):
+        return repr(expression.literal)
+    return type(expression).__name__
+
+
+@attr.s(slots=True, cmp=False)
+class Grammar(t.Generic[_R]):
+    """Parses text starting from a root expression."""
+
+    start: Expression[_R] = attr.ib()
+    no_memo: frozenset[str] = attr.ib(
+        kw_only=True, default=frozenset(), converter=frozenset
+    )
+    _expressions: set[Expression] = attr.ib(init=False, repr=False, factory=set)
+    _unmemoized: frozenset[Expression] = attr.ib(
+        init=False, repr=False, factory=frozenset
+    )
+
+    def __attrs_post_init__(self) -> None:
+        references: collections.Counter[Expression] = collections.Counter()
+        expressions = {self.start}
+        pending = [self.start]
+        while pending:
+            for child in _children(pending.pop()):
+                references[child] += 1
+                if child not in expressions:
+                    expressions.add(child)
+                    pending.append(child)
+        # Expressions can be shared between grammars, so what a grammar
+        # chooses not to memoize is kept here instead of on the expressions.
+        unmemoized: set[Expression] = set()
+        firsts: dict[Expression, t.Optional[frozenset[str]]] = {}
+        nullable: dict[Expression, bool] = {}
+        for expression in expressions:
+            if isinstance(expression, (Literal, _Pattern)):
+                if references[expression] <= 1:
+                    unmemoized.add(expression)
+            elif isinstance(expression, Rule):
+                if expression.name in self.no_memo:
+                    unmemoized.add(expression)
+            elif isinstance(expression, Alternatives):
+                expression._table, expression._fallback = _dispatch_table(
+                    expression.alternatives, firsts
+                )
+            elif isinstance(expression, (Some, Many)):
+                expression._consuming = not _nullable(expression.expression, nullable)
+        _reject_left_recursion(expressions)
+        self._expressions = expressions
+        self._unmemoized = frozenset(unmemoized)
+
+    def validate(self) -> None:
+        """Warns about alternatives that can start with the same character.
+
+        Ordered choice still picks the first match among them, but overlaps
+        are where backtracking piles up. Left recursion is rejected earlier,
+        when the grammar is created.
+        """
+        firsts: dict[Expression, t.Optional[frozenset[str]]] = {}
+        for expression in self._expressions:
+            if not isinstance(expression, Alternatives):
+                continue
+            seen: dict[str, Expression] = {}
+            for alternative in expression.alternatives:
+                first = _first_characters(alternative, firsts) or frozenset()
+                for character in sorted(first & seen.keys()):
+                    warnings.warn(
+                        f"{_describe(seen[character])} and {_describe(alternative)}"
+                        f" can both start with {character!r}",
+                        stacklevel=2,
+                    )
+                for character in first:
+                    seen.setdefault(character, alternative)
+
+    def parse(self, text: str) -> t.Optional[_R]:
+        return self.start.parse(ParserState(text, 0, unmemoized=self._unmemoized))
+
+    def compile(self) -> t.Callable[[str], t.Optional[_R]]:
+        """Generates a parser specialized to this grammar."""
+        parse = Compiler(self._unmemoized).compile(self.start)
+
+        def _parse(text: str) -> t.Optional[_R]:
+            return parse(ParserState(text, 0, unmemoized=self._unmemoized))
+
+        return _parse
@@ -1,38 +1,172 @@
 from __future__ import annotations
 
+import re
+import sys
 import typing as t
 
 import attr
 
-from simon.errors import UnknownTokenError
+from simon.errors import EmptyTokenError, UnknownTokenError
+from simon.utils import _line_offsets
 
 
-@attr.s(frozen=True, slots=True)
-class Token:
+class Token(t.NamedTuple):
     """Key-value pair of a `type_` and a `value`."""
 
-    type_: str = attr.ib()
-    value: str = attr.ib()
+    type_: str
+    value: str
 
 
-@attr.s
+_INLINE_FLAGS = {
+    re.ASCII: "a",
+    re.IGNORECASE: "i",
+    re.MULTILINE: "m",
+    re.DOTALL: "s",
+    re.VERBOSE: "x",
+}
+
+_NUMBERED_REFERENCE = re.compile(r"\\[1-9]|\(\?\(\d")
+
+# Before 3.11, a global flag past the start of a pattern only warns, and then
+# applies to the whole combined pattern instead of its own alternative.
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def _combinable(source: str) -> bool:
+    return not _NUMBERED_REFERENCE.search(source) and not _GLOBAL_FLAGS.search(source)
+
+
+def _combine_patterns(
+    patterns: dict[str, t.Pattern[str]],
+    skip: t.Optional[t.Pattern[str]],
+    compile_pattern: t.Callable[[str], t.Pattern[str]],
+) -> t.Optional[tuple[t.Pattern[str], list[str]]]:
+    """Joins `patterns` into one alternation, if it preserves their meaning.
+
+    Each pattern becomes an outer group, so `Match.lastindex` identifies the
+    terminal that matched while ordered choice is kept by the regex engine.
+    The `skip` pattern, if any, is matched atomically in front of it, so the
+    engine never backtracks into skipped text to find a token.
+    """
+    alternatives = []
+    terminals = [""]
+    prefix = ""
+    if skip is not None:
+        if not _combinable(skip.pattern):
+            return None
+        prefix = f"(?=(?P<_skip>{skip.pattern}))(?P=_skip)"
+        terminals.extend([""] * (skip.groups + 1))
+    for terminal, pattern in patterns.items():
+        if not isinstance(pattern, re.Pattern) or not isinstance(pattern.pattern, str):
+            return None
+        if not _combinable(pattern.pattern):
+            return None
+        flags = pattern.flags & ~re.UNICODE
+        inline = "".join(
+            letter for flag, letter in _INLINE_FLAGS.items() if flags & flag
+        )
+        if flags & ~sum(_INLINE_FLAGS):
+            return None
+        source = pattern.pattern + "\n" if flags & re.VERBOSE else pattern.pattern
+        alternatives.append(f"((?{inline}:{source}))")
+        terminals.append(sys.intern(terminal))
+        terminals.extend([""] * pattern.groups)
+    if not alternatives:
+        return None
+    try:
+        return compile_pattern(prefix + f"(?:{'|'.join(alternatives)})"), terminals
+    except re.error:
+        return None
+
+
+@attr.s(slots=True)
 class TokenStream:
     """Generates tokens from text and patterns."""
 
-    text: str = attr.ib(on_setattr=attr.setters.frozen)
-    patterns: dict[str, t.Pattern[str]] = attr.ib(on_setattr=attr.setters.frozen)
+    text: str = attr.ib()
+    patterns: dict[str, t.Pattern[str]] = attr.ib()
+    skip: t.Optional[str] = attr.ib(kw_only=True, default=None)
+    compile_pattern: t.Callable[[str], t.Pattern[str]] = attr.ib(
+        kw_only=True, repr=False, default=re.compile
+    )
 
     _text_idx: int = attr.ib(init=False, default=0)
+    _skip: t.Optional[t.Pattern[str]] = attr.ib(
+        init=False,
+        default=attr.Factory(
+            lambda self: None if self.skip is None else re.compile(f"(?:{self.skip})*"),
+            takes_self=True,
+        ),
+    )
+    _combined: t.Optional[t.Pattern[str]] = attr.ib(init=False, default=None)
+    _terminals: list[str] = attr.ib(init=False, factory=list)
+    _scanner: t.Any = attr.ib(init=False, default=None, repr=False)
+    _line_offsets: t.Optional[list[int]] = attr.ib(init=False, default=None, repr=False)
+    _rules: list[tuple[str, t.Pattern[str]]] = attr.ib(
+        init=False,
+        repr=False,
+        default=attr.Factory(
+            lambda self: [
+                (sys.intern(terminal), pattern)
+                for terminal, pattern in self.patterns.items()
+            ],
+            takes_self=True,
+        ),
+    )
+
+    def __attrs_post_init__(self) -> None:
+        for terminal, pattern in self._rules:
+            if pattern.match(""):
+                raise EmptyTokenError(terminal)
+        combined = _combine_patterns(self.patterns, self._skip, self.compile_pattern)
+        if combined is not None:
+            self._combined, self._terminals = combined
+            # The scanner keeps its position in C, and stops for good at the
+            # first text the pattern cannot match.
+            self._scanner = self._combined.scanner(self.text)  # type: ignore
+
+    def _skipped(self, position: int) -> int:
+        if self._skip is not None and (match := self._skip.match(self.text, position)):
+            return match.end()
+        return position
 
     def _generate_token(self) -> t.Optional[Token]:
         if self._text_idx >= len(self.text):
             return None
-        for terminal, pattern in self.patterns.items():
-            if match := pattern.match(self.text, self._text_idx):
-                self._text_idx = match.end(0)
-                return Token(terminal, match.group(0))
+        if self._combined is not None:
+            if match := self._scanner.match():
+                self._text_idx = match.end()
+                index = t.cast(int, match.lastindex)
+                return Token(self._terminals[index], match.group(index))
         else:
-            raise UnknownTokenError(self.text, self._text_idx)
+            position = self._skipped(self._text_idx)
+            for terminal, pattern in self._rules:
+                if match := pattern.match(self.text, position):
+                    self._text_idx = match.end(0)
+                    return Token(terminal, match.group(0))
+        if (position := self._skipped(self._text_idx)) == len(self.text):
+            self._text_idx = position
+            return None
+        if self._line_offsets is None:
+            self._line_offsets = _line_offsets(self.text)
+        raise UnknownTokenError(self.text, position, line_offsets=self._line_offsets)
+
+    def _drain(self) -> list[Token]:
+        """Lexes every token up to the end or the first unknown character."""
+        if self._combined is None:
+            return []
+        tokens: list[Token] = []
+        append = tokens.append
+        terminals = self._terminals
+        # Skips the Python-level `Token.__new__` that only forwards its fields.
+        new = tuple.__new__
+        match = None
+        for match in iter(self._scanner.match, None):
+            index = match.lastindex
+            append(new(Token, (terminals[index], match.group(index))))
+        if match is not None:
+            self._text_idx = match.end()
+        return tokens
 
     def __iter__(self) -> TokenStream:
         return self
@@ -43,12 +177,17 @@ class TokenStream:
         return token
 
 
-@attr.s
+@attr.s(slots=True)
 class Lexer:
     """Provides an API for stateful on-demand lexing."""
 
-    text: str = attr.ib(on_setattr=attr.setters.frozen)
-    patterns: dict[str, t.Pattern[str]] = attr.ib(on_setattr=attr.setters.frozen)
+    text: str = attr.ib()
+    patterns: dict[str, t.Pattern[str]] = attr.ib()
+
+    skip: t.Optional[str] = attr.ib(kw_only=True, default=None)
+    compile_pattern: t.Callable[[str], t.Pattern[str]] = attr.ib(
+        kw_only=True, repr=False, default=re.compile
+    )
 
     _tokens: list[Token] = attr.ib(init=False, factory=list)
     _token_idx: int = attr.ib(init=False, default=0)
@@ -56,11 +195,19 @@ class Lexer:
     _token_stream: TokenStream = attr.ib(
         init=False,
         default=attr.Factory(
-            lambda self: TokenStream(self.text, self.patterns), takes_self=True
+            lambda self: TokenStream(
+                self.text,
+                self.patterns,
+                skip=self.skip,
+                compile_pattern=self.compile_pattern,
+            ),
+            takes_self=True,
         ),
     )
 
     def peek_token(self) -> t.Optional[Token]:
+        if self._token_idx == len(self._tokens):
+            self._tokens.extend(self._token_stream._drain())
         if self._token_idx == len(self._tokens):
             token = next(self._token_stream, None)
             if token is not None:
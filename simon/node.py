@@ -5,6 +5,9 @@ import attr
 
 _C = t.TypeVar("_C")
 
+# Shared by every zero-width node; never mutate it.
+_EMPTY_CHILDREN: list = []
+
 
 @attr.s(slots=True)
 class Node(t.Generic[_C]):
@@ -14,5 +17,13 @@ class Node(t.Generic[_C]):
     tag: str = attr.ib(default="")
 
 
+@attr.s(slots=True)
+class LeafNode:
+    value: str = attr.ib()
+    start: int = attr.ib()
+    end: int = attr.ib()
+    tag: str = attr.ib(default="")
+
+
 def _node_id(node: Node) -> Node:
     return node
@@ -1,11 +1,18 @@
-def _compute_row_col(text: str, position: int) -> tuple[int, int]:
-    row = 1
-    col = 1
-    current = 0
-    while current != position:
-        if text[current] == "\n":
-            row += 1
-            col = 0
-        col += 1
-        current += 1
-    return (row, col)
+import bisect
+import re
+import typing as t
+
+
+def _line_offsets(text: str) -> list[int]:
+    return [match.start() for match in re.finditer("\n", text)]
+
+
+def _compute_row_col(
+    text: str, position: int, offsets: t.Optional[list[int]] = None
+) -> tuple[int, int]:
+    if offsets is None:
+        row = text.count("\n", 0, position)
+        return (row + 1, position - text.rfind("\n", 0, position))
+    row = bisect.bisect_left(offsets, position)
+    col = position - offsets[row - 1] if row else position + 1
+    return (row + 1, col)
@@ -0,0 +1,414 @@
+import functools
+import re
+import sys
+
+import pytest
+
+from simon.compiler import Compiler
+from simon.errors import LeftRecursionError
+from simon.grammar import (
+    Alternatives,
+    Cut,
+    Grammar,
+    Literal,
+    Many,
+    NegativeLookahead,
+    Optional,
+    ParserState,
+    PositiveLookahead,
+    RegEx,
+    Rule,
+    Sequence,
+    Some,
+)
+from simon.node import _node_id, LeafNode, Node
+
+
+def _sum_grammar() -> Grammar:
+    number = Rule("number", RegEx(r"\d+", action=_node_id), action=_node_id)
+    sum_ = Rule("sum", None, action=_node_id)
+    sum_.expr = Alternatives(
+        [
+            Sequence([number, Literal("+", action=_node_id), sum_], action=_node_id),
+            number,
+        ],
+        action=_node_id,
+    )
+    return Grammar(sum_)
+
+
+def _keyword_grammar() -> Grammar:
+    keyword = Alternatives(
+        [Literal(keyword, action=_node_id) for keyword in ["if", "else", "while"]],
+        action=_node_id,
+    )
+    return Grammar(
+        Some(
+            Alternatives([keyword, Literal(" ", action=_node_id)], action=_node_id),
+            action=_node_id,
+        )
+    )
+
+
+def _signed_grammar() -> Grammar:
+    return Grammar(
+        Sequence(
+            [
+                Optional(Literal("-", action=_node_id), action=_node_id),
+                Many(RegEx(r"\d", action=_node_id), action=_node_id),
+                Some(Literal(" ", action=_node_id), action=_node_id),
+                PositiveLookahead(Literal("x", action=_node_id), action=_node_id),
+                NegativeLookahead(Literal("y", action=_node_id), action=_node_id),
+            ],
+            action=_node_id,
+        )
+    )
+
+
+def _memoized_rules(state: ParserState) -> set[str]:
+    return {rule.name for rule in state.cache if isinstance(rule, Rule)}
+
+
+class TestLiteral:
+    def test_Literal_matches_text(self) -> None:
+        literal = Literal("guido", action=_node_id)
+        state = ParserState("guido 1991", 0)
+
+        assert literal.parse(state) == LeafNode("guido", 0, 5)
+        assert state.position == 5
+
+    def test_Literal_escapes_pattern(self) -> None:
+        literal = Literal("1+1", action=_node_id)
+
+        assert literal.parse(ParserState("11", 0)) is None
+        assert literal.parse(ParserState("1+1", 0)) == LeafNode("1+1", 0, 3)
+
+    def test_Literal_failure_keeps_position(self) -> None:
+        literal = Literal("1991", action=_node_id)
+        state = ParserState("guido 1991", 0)
+
+        assert literal.parse(state) is None
+        assert state.position == 0
+
+
+class TestRegEx:
+    def test_RegEx_compiles_once(self) -> None:
+        regex = RegEx(r"\d+", action=_node_id)
+
+        assert isinstance(regex._pattern, re.Pattern)
+        assert regex._pattern.pattern == r"\d+"
+
+    def test_RegEx_uses_compile_pattern(self) -> None:
+        compile_pattern = functools.partial(re.compile, flags=re.IGNORECASE)
+        regex = RegEx("guido", compile_pattern=compile_pattern, action=_node_id)
+
+        assert regex._pattern.flags & re.IGNORECASE
+        assert regex.parse(ParserState("Guido", 0)) == LeafNode("Guido", 0, 5)
+        assert Grammar(regex).compile()("GUIDO") == LeafNode("GUIDO", 0, 5)
+
+    def test_RegEx_matches_text(self) -> None:
+        regex = RegEx(r"\d+", action=_node_id)
+        state = ParserState("guido 1991", 6)
+
+        assert regex.parse(state) == LeafNode("1991", 6, 10)
+        assert state.position == 10
+
+
+class TestMemoization:
+    def test_cached_result_restores_position(self) -> None:
+        literal = Literal("guido", action=_node_id)
+        bang = Literal("!", action=_node_id)
+        expression = Alternatives(
+            [Sequence([literal, bang], action=_node_id), literal], action=_node_id
+        )
+        state = ParserState("guido 1991", 0)
+
+        assert expression.parse(state) == LeafNode("guido", 0, 5)
+        assert state.position == 5
+
+    def test_result_is_cached(self) -> None:
+        calls = []
+        literal = Literal("guido", action=lambda node: calls.append(node) or node)
+        state = ParserState("guido 1991", 0)
+
+        assert literal.parse(state) == LeafNode("guido", 0, 5)
+        state.move(0)
+        assert literal.parse(state) == LeafNode("guido", 0, 5)
+        assert state.position == 5
+        assert len(calls) == 1
+
+    def test_Cut_forgets_earlier_results(self) -> None:
+        literal = Literal("a", action=_node_id)
+        sequence = Sequence(
+            [literal, Cut(action=_node_id), literal, Cut(action=_node_id)],
+            action=_node_id,
+        )
+        state = ParserState("aa", 0)
+
+        assert sequence.parse(state) == Node(
+            [LeafNode("a", 0, 1), Node([], 1, 1), LeafNode("a", 1, 2), Node([], 2, 2)],
+            0,
+            2,
+        )
+        assert state.cache[literal] == {}
+        assert list(state.cache[sequence]) == [0]
+        assert Grammar(sequence).compile()("aa") == sequence.parse(ParserState("aa", 0))
+
+    def test_no_memo_rules_are_not_memoized(self) -> None:
+        grammar = _sum_grammar()
+        unmemoized = Grammar(grammar.start, no_memo={"number"})
+        state = ParserState("1+2", 0, unmemoized=unmemoized._unmemoized)
+
+        assert grammar.start.parse(state) is not None
+        assert _memoized_rules(state) == {"sum"}
+        assert unmemoized.compile()("1+2") == _sum_grammar().parse("1+2")
+
+    def test_no_memo_leaves_other_grammars_memoized(self) -> None:
+        grammar = _sum_grammar()
+        Grammar(grammar.start, no_memo={"number"})
+        state = ParserState("1+2", 0, unmemoized=grammar._unmemoized)
+
+        assert grammar.start.parse(state) is not None
+        assert _memoized_rules(state) == {"sum", "number"}
+
+
+class TestRepetition:
+    def test_consuming_expression_skips_zero_width_check(self) -> None:
+        many = Many(Literal("ab", action=_node_id), action=_node_id)
+        some = Some(Sequence([many], action=_node_id), action=_node_id)
+
+        assert many._consuming
+        assert some._consuming
+        assert some.parse(ParserState("ababa", 0)) == Node(
+            [Node([Node([LeafNode("ab", 0, 2), LeafNode("ab", 2, 4)], 0, 4)], 0, 4)],
+            0,
+            4,
+        )
+
+    def test_nullable_expression_stops_on_zero_width(self) -> None:
+        optional = Optional(Literal("ab", action=_node_id), action=_node_id)
+        some = Some(optional, action=_node_id)
+        state = ParserState("aba", 0)
+
+        assert not some._consuming
+        assert not Many(RegEx("a*", action=_node_id), action=_node_id)._consuming
+        assert some.parse(state) == Node([LeafNode("ab", 0, 2)], 0, 2)
+        assert state.position == 2
+
+    def test_consuming_repetition_ends_at_last_match(self) -> None:
+        literal = Literal("a", action=lambda node: node if node.start < 2 else None)
+        grammar = Grammar(Some(literal, action=_node_id))
+
+        assert grammar.start._consuming
+        assert grammar.parse("aaa") == grammar.compile()("aaa")
+        assert grammar.parse("aaa").end == 2
+
+    def test_Grammar_decides_consuming_through_rules(self) -> None:
+        item = Rule("item", None, action=_node_id)
+        some = Some(item, action=_node_id)
+        item.expr = Literal("ab", action=_node_id)
+
+        assert not some._consuming
+        Grammar(some)
+        assert some._consuming
+
+    def test_capture_false_discards_children(self) -> None:
+        space = Literal(" ", action=_node_id)
+        many = Many(space, action=_node_id, capture=False)
+        sequence = Sequence(
+            [many, Literal("x", action=_node_id)], action=_node_id, capture=False
+        )
+        some = Some(sequence, action=_node_id, capture=False)
+        parse = Grammar(some).compile()
+
+        assert some.parse(ParserState("  x x", 0)) == Node([], 0, 5)
+        assert parse("  x x") == Node([], 0, 5)
+        assert parse("x") == Node([], 0, 0)
+
+
+class TestAlternatives:
+    def test_nested_Alternatives_are_flattened(self) -> None:
+        a, b, c = (Literal(x, action=_node_id) for x in "abc")
+        inner = Alternatives([b, c], action=_node_id)
+
+        assert Alternatives([a, inner], action=_node_id).alternatives == [a, b, c]
+
+    def test_nested_Alternatives_with_action_are_kept(self) -> None:
+        a, b, c = (Literal(x, action=_node_id) for x in "abc")
+        inner = Alternatives([b, c], action=lambda node: node.children)
+
+        assert Alternatives([a, inner], action=_node_id).alternatives == [a, inner]
+
+    def test_distinct_first_characters_build_table(self) -> None:
+        let = Sequence([Literal("let", action=_node_id)], action=_node_id)
+        fn = Literal("fn", action=_node_id)
+        expression = Alternatives([let, fn], action=_node_id)
+
+        assert expression._table == {"l": [let], "f": [fn]}
+        assert expression._fallback == []
+        assert expression.parse(ParserState("fn", 0)) == LeafNode("fn", 0, 2)
+        assert expression.parse(ParserState("lex", 0)) is None
+        assert expression.parse(ParserState("", 0)) is None
+
+    def test_shared_first_characters_keep_order(self) -> None:
+        let, l_ = Literal("let", action=_node_id), Literal("l", action=_node_id)
+        expression = Alternatives([let, l_], action=_node_id)
+
+        assert expression._table == {"l": [let, l_]}
+        assert expression.parse(ParserState("lex", 0)) == LeafNode("l", 0, 1)
+
+    def test_unknown_first_characters_fall_back(self) -> None:
+        a, c = Literal("a", action=_node_id), Literal("c", action=_node_id)
+        word = RegEx("[a-z]+", action=_node_id)
+        expression = Alternatives([a, word, c], action=_node_id)
+        parse = Grammar(expression).compile()
+
+        assert expression._table == {"a": [a, word], "c": [word, c]}
+        assert expression._fallback == [word]
+        for text in ["a", "ab", "cat", "b", "", "1"]:
+            assert parse(text) == expression.parse(ParserState(text, 0))
+        assert parse("cat") == LeafNode("cat", 0, 3)
+
+    def test_Grammar_rebuilds_table_once_rules_are_bound(self) -> None:
+        atom = Rule("atom", None, action=_node_id)
+        minus = Literal("-", action=_node_id)
+        expression = Alternatives([atom, minus], action=_node_id)
+        atom.expr = Literal("x", action=_node_id)
+
+        assert expression._fallback == [atom]
+        Grammar(expression)
+        assert expression._table == {"x": [atom], "-": [minus]}
+        assert expression._fallback == []
+
+    def test_Alternatives_leave_rules_to_Grammar(self) -> None:
+        atom = Rule("atom", Literal("x", action=_node_id), action=_node_id)
+        minus = Literal("-", action=_node_id)
+        expression = Alternatives([atom, minus], action=_node_id)
+
+        assert expression._table == {"-": [atom, minus]}
+        assert expression._fallback == [atom]
+
+
+class TestRule:
+    def test_Rule_tags_node(self) -> None:
+        rule = Rule("number", RegEx(r"\d+", action=_node_id), action=_node_id)
+
+        assert rule.parse(ParserState("1991", 0)) == LeafNode("1991", 0, 4, "number")
+
+    def test_Rule_interns_name(self) -> None:
+        name = "".join(["num", "ber"])
+        rule = Rule(name, RegEx(r"\d+", action=_node_id), action=_node_id)
+
+        assert rule.name is sys.intern("number")
+
+    def test_Rule_applies_expression_action(self) -> None:
+        number = RegEx(r"\d+", action=lambda node: int(node.value))
+        rule = Rule("number", number, action=lambda value: value + 1)
+        state = ParserState("1991", 0)
+
+        assert rule.parse(state) == 1992
+        assert state.position == 4
+        assert Grammar(rule).compile()("1991") == 1992
+
+
+class TestGrammar:
+    def test_parse(self) -> None:
+        grammar = _sum_grammar()
+
+        assert grammar.parse("1+2") == Node(
+            [
+                LeafNode("1", 0, 1, "number"),
+                LeafNode("+", 1, 2),
+                LeafNode("2", 2, 3, "sum"),
+            ],
+            0,
+            3,
+            "sum",
+        )
+
+    def test_left_recursion_is_rejected(self) -> None:
+        number = Rule("number", RegEx(r"\d+", action=_node_id), action=_node_id)
+        sum_ = Rule("sum", None, action=_node_id)
+        term = Rule("term", None, action=_node_id)
+        sign = Optional(Literal("-", action=_node_id), action=_node_id)
+        sum_.expr = Alternatives(
+            [Sequence([term, Literal("+", action=_node_id)], action=_node_id), number],
+            action=_node_id,
+        )
+        term.expr = Sequence([sign, sum_], action=_node_id)
+
+        with pytest.raises(LeftRecursionError, match="sum -> term -> sum"):
+            Grammar(sum_)
+
+        lookahead = Rule("lookahead", None, action=_node_id)
+        lookahead.expr = Alternatives(
+            [
+                Sequence([RegEx("(?=a)", action=_node_id), lookahead], action=_node_id),
+                Literal("b", action=_node_id),
+            ],
+            action=_node_id,
+        )
+
+        with pytest.raises(LeftRecursionError, match="lookahead -> lookahead"):
+            Grammar(lookahead)
+
+    def test_validate_warns_on_shared_first_characters(self) -> None:
+        expression = Alternatives(
+            [Literal("let", action=_node_id), Literal("l", action=_node_id)],
+            action=_node_id,
+        )
+
+        with pytest.warns(UserWarning, match="'let' and 'l' can both start with 'l'"):
+            Grammar(expression).validate()
+
+    def test_single_use_leaves_are_not_memoized(self) -> None:
+        shared = Literal("a", action=_node_id)
+        single = RegEx("b", action=_node_id)
+        sequence = Sequence([shared, single, shared], action=_node_id)
+        grammar = Grammar(sequence)
+        state = ParserState("aba", 0, unmemoized=grammar._unmemoized)
+
+        assert sequence.parse(state) is not None
+        assert set(state.cache) == {shared, sequence}
+
+    def test_leaf_memoization_is_decided_per_grammar(self) -> None:
+        literal = Literal("a", action=_node_id)
+        twice = Grammar(Sequence([literal, literal], action=_node_id))
+        once = Grammar(Sequence([literal], action=_node_id))
+        state = ParserState("aa", 0, unmemoized=twice._unmemoized)
+
+        assert twice.start.parse(state) is not None
+        assert literal in state.cache
+        assert literal in once._unmemoized
+
+    def test_lookaheads_are_not_memoized(self) -> None:
+        literal = Literal("a", action=_node_id)
+        positive = PositiveLookahead(literal, action=_node_id)
+        negative = NegativeLookahead(literal, action=_node_id)
+        state = ParserState("a", 0)
+
+        negative.parse(state)
+        positive.parse(state)
+
+        assert list(state.cache) == [literal]
+
+    def test_single_use_leaves_are_inlined(self) -> None:
+        sign = Literal("-", action=lambda node: node.value)
+        sequence = Sequence([sign, RegEx(r"\d", action=_node_id)], action=_node_id)
+        compiler = Compiler(Grammar(sequence)._unmemoized)
+        parse = compiler.compile(sequence)
+
+        assert list(compiler._functions) == [sequence]
+        assert parse(ParserState("-1", 0)) == Node(["-", LeafNode("1", 1, 2)], 0, 2)
+
+    @pytest.mark.parametrize(
+        "grammar",
+        [_sum_grammar(), _signed_grammar(), _keyword_grammar()],
+        ids=["sum", "signed", "keyword"],
+    )
+    @pytest.mark.parametrize(
+        "text",
+        ["", "1", "1+", "1+2+30", "-12  y", "12 x", "-", "1 2", "+1", "if else wh"],
+    )
+    def test_compile_matches_parse(self, grammar: Grammar, text: str) -> None:
+        assert grammar.compile()(text) == grammar.parse(text)
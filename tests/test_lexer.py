@@ -1,9 +1,10 @@
 import re
+import sys
 
 import pytest
 
-from simon.errors import UnknownTokenError
-from simon.lexer import Lexer, Token, TokenStream
+from simon.errors import EmptyTokenError, UnknownTokenError
+from simon.lexer import _combine_patterns, Lexer, Token, TokenStream
 
 
 PATTERNS = {
@@ -28,6 +29,106 @@ class TestTokenStream:
         with pytest.raises(StopIteration):
             next(token_stream)
 
+    @pytest.mark.parametrize(
+        "pattern", [re.compile("[a-z]+"), re.compile(r"([a-z])\1*")]
+    )
+    def test_TokenStream_interns_terminals(self, pattern: re.Pattern) -> None:
+        terminal = "".join(["NA", "ME"])
+        token_stream = TokenStream("aab", {terminal: pattern})
+
+        assert next(token_stream).type_ is sys.intern("NAME")
+
+    def test_TokenStream_combines_patterns(self) -> None:
+        patterns = {
+            "KEYWORD": re.compile("(if|else)(?![a-z])", re.IGNORECASE),
+            "NAME": re.compile("[a-z]+ # lowercase", re.VERBOSE),
+            "ASCII": re.compile(r"\w", re.ASCII),
+            "WHITESPACE": re.compile(r"\s+"),
+        }
+        token_stream = TokenStream("IF iffy 1", patterns)
+
+        assert token_stream._combined is not None
+        assert list(token_stream) == [
+            Token("KEYWORD", "IF"),
+            Token("WHITESPACE", " "),
+            Token("NAME", "iffy"),
+            Token("WHITESPACE", " "),
+            Token("ASCII", "1"),
+        ]
+
+    def test_TokenStream_compile_pattern_builds_combined_pattern(self) -> None:
+        sources = []
+
+        def compile_pattern(source: str) -> re.Pattern:
+            sources.append(source)
+            return re.compile(source)
+
+        lexer = Lexer("guido 1991", PATTERNS, compile_pattern=compile_pattern)
+
+        assert lexer.next_token() == Token("NAME", "guido")
+        assert len(sources) == 1
+
+    def test_TokenStream_keeps_numbered_references(self) -> None:
+        patterns = {
+            "STRING": re.compile(r"(['\"]).*?\1"),
+            "WHITESPACE": re.compile(r"\s+"),
+        }
+        token_stream = TokenStream('\'a"\' "b"', patterns)
+
+        assert token_stream._combined is None
+        assert list(token_stream) == [
+            Token("STRING", "'a\"'"),
+            Token("WHITESPACE", " "),
+            Token("STRING", '"b"'),
+        ]
+
+    def test_TokenStream_keeps_global_flags_to_their_pattern(self) -> None:
+        patterns = {
+            "KEYWORD": re.compile("(?i)if"),
+            "NAME": re.compile("[a-z]+"),
+            "WHITESPACE": re.compile(r"\s+"),
+        }
+        token_stream = TokenStream("IF ABC", patterns)
+
+        assert token_stream._combined is None
+        assert next(token_stream) == Token("KEYWORD", "IF")
+        assert next(token_stream) == Token("WHITESPACE", " ")
+        with pytest.raises(UnknownTokenError) as excinfo:
+            next(token_stream)
+
+        assert excinfo.value.position == 3
+
+    def test_global_flags_are_not_combined(self) -> None:
+        def compile_pattern(source: str) -> re.Pattern:
+            pytest.fail(f"compiled {source!r}")
+
+        skip = re.compile("(?x) # ")
+        patterns = {"IF": re.compile("(?i)if")}
+
+        assert _combine_patterns(patterns, None, compile_pattern) is None
+        assert _combine_patterns(PATTERNS, skip, compile_pattern) is None
+
+    @pytest.mark.parametrize(
+        "patterns", [PATTERNS, {**PATTERNS, "BACKREFERENCE": re.compile(r"(')\1")}]
+    )
+    def test_TokenStream_skips_pattern(self, patterns: dict) -> None:
+        token_stream = TokenStream(" guido # name\n 1991 ", patterns, skip=r"\s|#.*")
+
+        assert list(token_stream) == [Token("NAME", "guido"), Token("INTEGER", "1991")]
+
+    def test_skipped_text_is_not_reported(self) -> None:
+        token_stream = TokenStream("guido  + 1", PATTERNS, skip=r"\s")
+
+        assert next(token_stream) == Token("NAME", "guido")
+        with pytest.raises(UnknownTokenError) as excinfo:
+            next(token_stream)
+
+        assert excinfo.value.position == 7
+
+    def test_empty_pattern_raises_EmptyTokenError(self) -> None:
+        with pytest.raises(EmptyTokenError, match="Pattern for SPACE matches empty"):
+            TokenStream("guido 1991", {**PATTERNS, "SPACE": re.compile(" *")})
+
     def test_invalid_character_raises_UnknownTokenError(self) -> None:
         token_stream = TokenStream("1\n+ 1", PATTERNS)
 
@@ -70,8 +171,32 @@ class TestLexer:
         assert lexer._tokens == [
             Token("NAME", "guido"),
             Token("WHITESPACE", " "),
+            Token("INTEGER", "1991"),
         ]
 
+    def test_unknown_token_is_raised_when_reached(self) -> None:
+        lexer = Lexer("guido +", PATTERNS)
+
+        assert lexer.next_token() == Token("NAME", "guido")
+        assert lexer.next_token() == Token("WHITESPACE", " ")
+        with pytest.raises(UnknownTokenError) as excinfo:
+            lexer.peek_token()
+
+        assert excinfo.value.position == 6
+
+    def test_repeated_errors_share_line_offsets(self) -> None:
+        lexer = Lexer("1\n+ 1", PATTERNS)
+        lexer.next_token()
+        lexer.next_token()
+        errors = []
+        for _ in range(2):
+            with pytest.raises(UnknownTokenError) as excinfo:
+                lexer.peek_token()
+            errors.append(excinfo.value)
+
+        assert errors[0].line_offsets is errors[1].line_offsets
+        assert errors[1].row_col == (2, 1)
+
     def test_mark(self) -> None:
         lexer = Lexer("guido 1991", PATTERNS)
 
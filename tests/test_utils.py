@@ -0,0 +1,15 @@
+import pytest
+
+from simon.utils import _compute_row_col, _line_offsets
+
+
+@pytest.mark.parametrize("cached", [False, True])
+@pytest.mark.parametrize(
+    "position, row_col",
+    [(0, (1, 1)), (3, (1, 4)), (4, (2, 1)), (5, (3, 1)), (7, (3, 3)), (8, (4, 1))],
+)
+def test_compute_row_col(position: int, row_col: tuple[int, int], cached: bool) -> None:
+    text = "abc\n\nde\nf"
+    offsets = _line_offsets(text) if cached else None
+
+    assert _compute_row_col(text, position, offsets) == row_col